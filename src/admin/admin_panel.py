@@ -1,6 +1,7 @@
 import streamlit as st 
 
 from auth import load_users
+from utils import result_cache
 from recipes import load_recipe, handle_delete_recipe
 
 from .change_role import change_role
@@ -22,4 +23,10 @@ def show_admin_panel():
     st.write(df)
     
     # --- CHANGE USER ROLE ---
-    change_role()
\ No newline at end of file
+    change_role()
+    
+    # --- RESULT CACHE ---
+    st.subheader('Such-Cache')
+    stats = result_cache.stats()
+    st.write(f"Trefferquote: {stats['hit_rate']:.0%} | Treffer: {stats['hits']} | Fehlschläge: {stats['misses']} | "
+             f"Einträge: {stats['entries']} | Speicher: {stats['bytes'] / 1024:.0f} KB")
\ No newline at end of file
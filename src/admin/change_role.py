@@ -2,7 +2,8 @@ import streamlit as st
 
 from uuid import uuid4
 
-from auth import update_config
+from auth import update_config, load_users
+from database import get_record_store, User
 
 def change_role():
     """
@@ -14,7 +15,7 @@ def change_role():
     the function updates the role in the configuration and the connected Google Sheet.
 
     Functionality:
-    - Loads the current configuration and worksheet from session state.
+    - Loads the current configuration and worksheet from session state and the users from the snapshot.
     - Displays a list of available users to choose from.
     - Prevents modification of the main admin account.
     - Filters available roles based on the selected user's current role.
@@ -30,15 +31,17 @@ def change_role():
 
     config = st.session_state['config']
     worksheet = st.session_state['worksheet']    
+    df, _ = load_users()
+    users = get_record_store(df, User)
 
-    selected_user = st.selectbox('Wählen Sie einen Benutzer', options=list(config['credentials']['usernames'].keys()), index=None)
+    selected_user = st.selectbox('Wählen Sie einen Benutzer', options=users.keys(), index=None)
     
     if selected_user is None:
         st.info('Bitte wähle einen Benutzer aus.')
     elif selected_user == 'admin':
         st.error('Dieser Benutzer kann nicht verändert werden.')
     else:
-        current_role = config['credentials']['usernames'][selected_user]['role']
+        current_role = users.get(selected_user).role
         st.write(f"Aktuelle Rolle von `{selected_user}`: `{current_role}`")
         
         available_roles = [role for role in ['admin', 'user', 'demo'] if role != current_role]
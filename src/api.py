@@ -0,0 +1,250 @@
+import bcrypt
+import streamlit as st
+import tornado.web
+
+import argparse
+import asyncio
+import json
+import os
+from collections import OrderedDict
+
+from auth import create_token, verify_token, password_fingerprint
+from database import get_snapshot, get_record_store, Recipe, User
+from recipes.query import FACETS, make_filter, query_recipes
+from recipes.similarity import get_similarity_engine
+from utils import load_yaml_config, search, result_cache, normalize_query
+
+
+MAX_PER_PAGE = 100
+MAX_CACHED_RESPONSES = 1024
+
+
+def recipe_to_dict(recipe):
+    return {column: getattr(recipe, field) for field, column in Recipe.FIELDS.items()}
+
+
+def check_password(password, hashed):
+    # A stored password that is no bcrypt hash, e.g. an empty cell, never matches
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), str(hashed).encode('utf-8'))
+    except ValueError:
+        return False
+
+
+def load_api_secret():
+    """
+    Loads the secret the API tokens are signed with.
+
+    The secret is read from the environment variable EASY_EAT_API_SECRET or from `token_secret`
+    in the [api] section of the Streamlit secrets. It must not be the public cookie key of config.yaml.
+
+    Returns:
+        str: The secret.
+    """
+    secret = os.environ.get('EASY_EAT_API_SECRET')
+    if not secret:
+        try:
+            secret = st.secrets['api']['token_secret']
+        except (FileNotFoundError, KeyError):
+            secret = None
+    if not secret:
+        raise SystemExit('Kein API-Secret gefunden. Setzen Sie EASY_EAT_API_SECRET oder api.token_secret in secrets.toml.')
+    return secret
+
+
+class ApiHandler(tornado.web.RequestHandler):
+    """
+    Base handler of the read-only JSON API.
+
+    GET requests require a bearer token, which is only valid while its user exists with the same password,
+    and are answered from the shared recipe snapshot written by the
+    Streamlit processes; neither Streamlit nor Google Sheets is touched. The ETag is the snapshot version,
+    so unchanged resources are answered with 304 before any work is done. Encoded responses are kept
+    per (snapshot version, URI) for repeated requests. Searches and index builds run in the thread pool,
+    so the event loop keeps serving other requests meanwhile.
+    """
+
+    def initialize(self, settings):
+        self.api_settings = settings
+
+    def find_user(self, username):
+        users = get_snapshot('users', self.api_settings['snapshot_cache']).read()
+        return get_record_store(users, User).get(username) if users is not None else None
+
+    def user_fingerprint(self, username):
+        user = self.find_user(username)
+        return password_fingerprint(user.password) if user is not None else None
+
+    def prepare(self):
+        if self.request.method != 'GET':
+            return
+
+        authorization = self.request.headers.get('Authorization', '')
+        if not authorization.startswith('Bearer ') or verify_token(authorization[7:], self.api_settings['key'], self.user_fingerprint) is None:
+            self.send_json_error(401, 'Ungültiges oder abgelaufenes Token.')
+            return
+
+        self.df = get_snapshot('recipes', self.api_settings['snapshot_cache']).read()
+        if self.df is None:
+            self.send_json_error(503, 'Es sind noch keine Rezepte geladen.')
+            return
+
+        self.version = self.df.attrs['snapshot_version']
+        self.set_header('Cache-Control', 'private, no-cache')
+        self.set_etag_header()
+        if self.check_etag_header():
+            self.set_status(304)
+            self.finish()
+            return
+
+        body = self.api_settings['responses'].get((self.version, self.request.uri))
+        if body is not None:
+            self.set_header('Content-Type', 'application/json; charset=UTF-8')
+            self.finish(body)
+
+    async def run_blocking(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    def compute_etag(self):
+        version = getattr(self, 'version', None)
+        return None if version is None else f'"recipes-{version}"'
+
+    def send_json_error(self, status, message):
+        self.set_status(status)
+        self.finish({'error': message})
+
+    def send_json(self, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        responses = self.api_settings['responses']
+        responses[(self.version, self.request.uri)] = body
+        while len(responses) > MAX_CACHED_RESPONSES:
+            responses.popitem(last=False)
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        self.finish(body)
+
+    async def send_page(self, rows):
+        try:
+            page = max(int(self.get_argument('page', '1')), 1)
+            per_page = min(max(int(self.get_argument('per_page', '20')), 1), MAX_PER_PAGE)
+        except ValueError:
+            self.send_json_error(400, 'page und per_page müssen Zahlen sein.')
+            return
+
+        selected = rows[(page - 1) * per_page:page * per_page]
+        store = await self.run_blocking(get_record_store, self.df, Recipe)
+        self.send_json({
+            'version': self.version,
+            'page': page,
+            'per_page': per_page,
+            'total': int(len(rows)),
+            'items': [recipe_to_dict(recipe) for recipe in store.records(selected)]
+        })
+
+
+class RecipeListHandler(ApiHandler):
+    """
+    GET /api/recipes?Kategorie=...&Ernährungsweise=...&Dauer=...&ohne=...&page=...&per_page=...
+    Facet arguments may be repeated, 'ohne' takes comma separated ingredients.
+    """
+
+    async def get(self):
+        facets = {column: self.get_arguments(column) for column in FACETS}
+        recipe_filter = make_filter(facets, excluded=self.get_argument('ohne', ''))
+        rows = await self.run_blocking(
+            result_cache.get_rows, self.df, 'advanced_filter', recipe_filter,
+            lambda: query_recipes(self.df, recipe_filter)
+        )
+        await self.send_page(rows)
+
+
+class RecipeSearchHandler(ApiHandler):
+    """
+    GET /api/recipes/search?q=...&page=...&per_page=...
+    """
+
+    async def get(self):
+        query = self.get_argument('q', '').strip()
+        if not query:
+            self.send_json_error(400, 'Der Parameter q fehlt.')
+            return
+        rows = await self.run_blocking(
+            result_cache.get_rows, self.df, 'search', normalize_query(query),
+            lambda: self.df.index.get_indexer(search(self.df, query).index)
+        )
+        await self.send_page(rows)
+
+
+class RecipeDetailHandler(ApiHandler):
+    """
+    GET /api/recipes/<Gericht>
+    """
+
+    async def get(self, name):
+        store = await self.run_blocking(get_record_store, self.df, Recipe)
+        recipe = store.get(name)
+        if recipe is None:
+            self.send_json_error(404, f'Das Rezept {name} wurde nicht gefunden.')
+            return
+        payload = recipe_to_dict(recipe)
+        engine = await self.run_blocking(get_similarity_engine, self.df)
+        payload['similar'] = engine.similar(recipe.name)
+        self.send_json(payload)
+
+
+class TokenHandler(ApiHandler):
+    """
+    POST /api/token with the JSON body {"username": ..., "password": ...}
+    """
+
+    async def post(self):
+        try:
+            credentials = json.loads(self.request.body)
+            username, password = credentials['username'], credentials['password']
+        except (ValueError, KeyError, TypeError):
+            username = password = None
+        if not isinstance(username, str) or not isinstance(password, str):
+            self.send_json_error(400, 'username und password werden benötigt.')
+            return
+
+        user = self.find_user(username)
+        # bcrypt is slow on purpose, check it off the event loop
+        valid = user is not None and await self.run_blocking(check_password, password, user.password)
+        if not valid:
+            self.send_json_error(401, 'Username/Passwort ist falsch')
+            return
+
+        token, expires = create_token(
+            username, self.api_settings['key'], self.api_settings['token_ttl'], password_fingerprint(user.password)
+        )
+        self.finish({'token': token, 'expires': expires})
+
+
+def make_app():
+    config = load_yaml_config()
+    api_config = config.get('api', {})
+    settings = {
+        'key': load_api_secret(),
+        'token_ttl': api_config.get('token_ttl_hours', 24) * 3600,
+        'snapshot_cache': config.get('snapshot_cache'),
+        'responses': OrderedDict()
+    }
+    return tornado.web.Application([
+        (r'/api/token', TokenHandler, {'settings': settings}),
+        (r'/api/recipes', RecipeListHandler, {'settings': settings}),
+        (r'/api/recipes/search', RecipeSearchHandler, {'settings': settings}),
+        (r'/api/recipes/(.+)', RecipeDetailHandler, {'settings': settings}),
+    ]), api_config.get('port', 8600)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Read-only JSON API über den EasyEat Rezepten.')
+    parser.add_argument('--port', type=int, help='Port der API, Standard aus config.yaml')
+    args = parser.parse_args()
+
+    app, port = make_app()
+    app.listen(args.port or port)
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
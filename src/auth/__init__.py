@@ -1,3 +1,4 @@
 from .authenticator import load_users, authenticate_user, handle_auth_error
 from .user_management import registrate_new_user, reset_pw, update_config
-from .auth_flow import handle_authentication
\ No newline at end of file
+from .auth_flow import handle_authentication
+from .tokens import create_token, verify_token, password_fingerprint
\ No newline at end of file
@@ -1,7 +1,7 @@
 import streamlit as st
 import streamlit_authenticator as stauth
 
-from database import load_sheet_data
+from database import load_sheet_data, open_worksheet, load_shared_sheet_data, get_record_store, User
 from utils import load_yaml_config
 
 
@@ -11,6 +11,7 @@ def load_users():
 
     This function connects to a Google Sheet using the provided Sheet ID and credentials,
     loads the data into a Pandas DataFrame, and returns both the DataFrame and the worksheet object.
+    The data is served from the snapshot shared by all server processes.
 
     Returns:
         tuple: A tuple containing:
@@ -20,7 +21,12 @@ def load_users():
     SHEET_ID = '1_nJOUU06XiRuq0W-d1kaY7e5oKa1tlXLettEh_T_xh8'
     secrets = st.secrets['google']['db_credentials']
 
-    df, worksheet = load_sheet_data(SHEET_ID, secrets)
+    df, worksheet = load_shared_sheet_data(
+        'users',
+        lambda: load_sheet_data(SHEET_ID, secrets),
+        lambda: open_worksheet(SHEET_ID, secrets),
+        load_yaml_config().get('snapshot_cache')
+    )
     return df, worksheet
 
 
@@ -35,15 +41,8 @@ def authenticate_user():
     """
     df, worksheet = load_users()
 
-    credentials = {'usernames': {}}
-    for _, row in df.iterrows():
-        username = row['username']
-        credentials['usernames'][username] = {
-            'email': row['email'],
-            'name': row['name'],
-            'password': row['password'],
-            'role': row['role']
-        }
+    users = get_record_store(df, User)
+    credentials = {'usernames': {user.username: user.credentials() for user in users}}
 
     config = load_yaml_config()   
     config['credentials'] = credentials
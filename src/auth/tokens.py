@@ -0,0 +1,73 @@
+import base64
+import hashlib
+import hmac
+import time
+
+
+def password_fingerprint(password_hash):
+    """
+    Returns a short fingerprint of a stored password hash, signed into the API tokens of the user.
+
+    Params:
+        password_hash (str): The bcrypt hash of the user sheet.
+
+    Returns:
+        str: The fingerprint.
+    """
+    return hashlib.sha256(str(password_hash).encode('utf-8')).hexdigest()[:16]
+
+
+def _sign(key, payload, fingerprint):
+    message = f'{payload}.{fingerprint}'.encode('utf-8')
+    return hmac.new(key.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def create_token(username, key, ttl_seconds, fingerprint=''):
+    """
+    Creates a signed API token for a user.
+
+    Params:
+        username (str): The username of the authenticated user.
+        key (str): The secret signing key of the API.
+        ttl_seconds (int): The lifetime of the token in seconds.
+        fingerprint (str): The `password_fingerprint` of the user, so the token ends with a password change.
+
+    Returns:
+        tuple: A tuple containing:
+            - str: The token.
+            - int: The expiry as unix timestamp.
+    """
+    expires = int(time.time()) + ttl_seconds
+    payload = base64.urlsafe_b64encode(f'{username}:{expires}'.encode('utf-8')).decode('ascii')
+    return f'{payload}.{_sign(key, payload, fingerprint)}', expires
+
+
+def verify_token(token, key, fingerprint_of=None):
+    """
+    Verifies a signed API token.
+
+    Params:
+        token (str): The token, as created by `create_token`.
+        key (str): The secret signing key the token was signed with.
+        fingerprint_of (callable): Returns the current `password_fingerprint` of a username, or None if the user
+            no longer exists | None for tokens without fingerprint.
+
+    Returns:
+        str: The username of the token | None if the token is invalid, expired or its user was deleted or changed the password.
+    """
+    payload, _, signature = token.partition('.')
+    try:
+        username, _, expires = base64.urlsafe_b64decode(payload).decode('utf-8').rpartition(':')
+        expires = int(expires)
+    except ValueError:
+        return None
+
+    fingerprint = fingerprint_of(username) if fingerprint_of is not None else ''
+    if fingerprint is None:
+        return None
+    # Compared as bytes, compare_digest rejects str arguments with non-ASCII characters
+    if not hmac.compare_digest(signature.encode('utf-8'), _sign(key, payload, fingerprint).encode('ascii')):
+        return None
+    if expires < time.time():
+        return None
+    return username
@@ -1,5 +1,8 @@
 import streamlit as st
-import pandas as pd
+
+from database import invalidate_snapshot, get_record_store, User
+
+from .authenticator import load_users
 
 
 def registrate_new_user(authenticator, config, worksheet):
@@ -63,6 +66,7 @@ def registrate_new_user(authenticator, config, worksheet):
                 'user'
             ]
             worksheet.append_row(new_data)
+            invalidate_snapshot('users')
 
     except Exception as e:
         st.error(e)
@@ -101,6 +105,9 @@ def update_config(config, user, worksheet, new_role=None):
     """
     Updates the configuration and Google Sheet with new user data.
 
+    The user is looked up in the user snapshot; the Google Sheet is only written
+    if the data differs from the snapshot.
+
     Params:
         config (dict): The configuration dictionary containing user credentials.
         user (str): The username of the user whose data is to be updated.
@@ -110,52 +117,59 @@ def update_config(config, user, worksheet, new_role=None):
     Returns:
         None
     """
-    users = config['credentials']['usernames']
+    details = config['credentials']['usernames'].get(user)
+    if details is None:
+        return None
+
+    df, _ = load_users()
+    stored = get_record_store(df, User).get(user)
+    role = new_role if new_role else (stored.role if stored else details.get('role'))
+    updated = User(
+        stored.position if stored else None,
+        user,
+        details.get('email'),
+        details.get('name'),
+        details.get('password'),
+        role
+    )
     
-    data_to_update = []
-    for username, details in users.items():
-        user_info = {
-            "username": username,
-            "email": details.get("email"),
-            "name": details.get("name"),
-            "password": details.get("password"),
-            "role": details.get("role")
-        }
-        data_to_update.append(user_info)
-        
+    # The snapshot already holds this data, e.g. on every rerun after the login
+    if stored is not None and stored.row() == updated.row():
+        config['credentials']['usernames'][user] = updated.credentials()
+        return
     
-    df = pd.DataFrame(data_to_update)
+    row_index = find_user_row(worksheet, user, stored)
+    if row_index is None:
+        return None
     
-    filtered_df = df[df['username'] == user]
+    worksheet.update(
+        range_name=f"A{row_index}:E{row_index}", 
+        values=[updated.row()]
+    )
+    invalidate_snapshot('users')
     
-    if not filtered_df.empty:
-        data = worksheet.get_all_records()
-        for i, row in enumerate(data):
-            if row['username'] == user:
-                row_index = i + 2
-
-                role = new_role if new_role else row['role']
-                
-                new_data = [
-                    user,
-                    filtered_df.iloc[0]['email'],  
-                    filtered_df.iloc[0]['name'], 
-                    filtered_df.iloc[0]['password'],
-                    role
-                      
-                ]
-                
-                worksheet.update(
-                    range_name=f"A{row_index}:E{row_index}", 
-                    values=[new_data]
-                )
-                
-                config['credentials']['usernames'][user] = {
-                'email': filtered_df.iloc[0]['email'],  
-                'name': filtered_df.iloc[0]['name'], 
-                'password': filtered_df.iloc[0]['password'], 
-                'role': role
-                }
-                return
-    else:
-        return None
\ No newline at end of file
+    config['credentials']['usernames'][user] = updated.credentials()
+
+
+def find_user_row(worksheet, user, stored):
+    """
+    Finds the sheet row of a user.
+
+    The row position of the snapshot is checked with a single row read, the whole
+    username column is only searched if the sheet changed since the snapshot was taken.
+
+    Params:
+        worksheet (gspread.models.Worksheet): The worksheet object representing the Google Sheet.
+        user (str): The username of the user.
+        stored (database.User): The user in the snapshot | None.
+
+    Returns:
+        int: The row number in the sheet | None if the user was not found.
+    """
+    if stored is not None:
+        row_index = stored.position + 2
+        if worksheet.row_values(row_index)[:1] == [user]:
+            return row_index
+
+    cell = worksheet.find(user, in_column=1)
+    return cell.row if cell else None
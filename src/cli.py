@@ -0,0 +1,41 @@
+import argparse
+import sys
+
+from recipes import load_recipe
+from recipes.bulk import import_recipes, export_recipes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import und Export von EasyEat Rezepten.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='Rezepte aus einer CSV- oder JSON-Lines-Datei importieren')
+    import_parser.add_argument('path', help='Pfad zur .csv oder .jsonl Datei')
+    import_parser.add_argument('--chunk-size', type=int, default=500, help='Zeilen pro Schreibanfrage')
+    import_parser.add_argument('--checkpoint', help='Checkpoint-Datei, um einen abgebrochenen Import fortzusetzen')
+
+    export_parser = commands.add_parser('export', help='Rezepte als CSV oder JSON Lines exportieren')
+    export_parser.add_argument('path', nargs='?', help='Zieldatei, ohne Angabe wird auf stdout geschrieben')
+    export_parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+
+    args = parser.parse_args()
+
+    # An import checks for duplicates, so it must not run on a snapshot that misses the rows of an interrupted run.
+    # Without a successful fresh fetch no worksheet is returned and the import stops here.
+    df, worksheet = load_recipe(fresh=args.command == 'import')
+    if worksheet is None:
+        sys.exit('Die Rezepte konnten nicht geladen werden.')
+
+    if args.command == 'import':
+        stats = import_recipes(worksheet, df, args.path, chunk_size=args.chunk_size, checkpoint_path=args.checkpoint)
+        print(f"Importiert: {stats['imported']} | Duplikate: {stats['duplicate']} | Ungültig: {stats['invalid']}")
+    elif args.path:
+        with open(args.path, 'w', newline='', encoding='utf-8') as file:
+            count = export_recipes(df, file, args.format)
+        print(f'{count} Rezepte exportiert.')
+    else:
+        export_recipes(df, sys.stdout, args.format)
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,4 @@
-from .db import load_sheet_data
\ No newline at end of file
+from .db import load_sheet_data, open_worksheet
+from .shards import ShardedWorksheet, load_sharded_sheet_data, open_sharded_worksheet
+from .snapshot import get_snapshot, load_shared_sheet_data, invalidate_snapshot, snapshot_table, cached_per_snapshot, cached_per_version
+from .records import Recipe, User, RecordStore, get_record_store
\ No newline at end of file
@@ -26,7 +26,84 @@ def load_credentials(secrets):
     return Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
 
 
-def load_sheet_data(sheet_id, secrets):
+def fetch_worksheet(client, sheet_id, worksheet_name=None):
+    """
+    Opens a worksheet and reads all of its values.
+
+    Params:
+        client (gspread.Client): An authorized gspread client.
+        sheet_id (str): The ID of the Google Sheet to load data from.
+        worksheet_name (str): The title of the worksheet to read | None for the first worksheet.
+
+    Returns:
+        tuple: A tuple containing:
+            - list: All cell values of the worksheet, the first row being the header.
+            - gspread.models.Worksheet: The worksheet object representing the Google Sheet.
+    """
+    sheet = client.open_by_key(sheet_id)
+    worksheet = sheet.worksheet(worksheet_name) if worksheet_name else sheet.sheet1
+    return worksheet.get_all_values(), worksheet
+
+
+def values_to_df(values_list, worksheet):
+    """
+    Converts the values of a worksheet into a DataFrame, using the first row as the header.
+
+    Params:
+        values_list (list): All cell values of the worksheet.
+        worksheet (gspread.models.Worksheet): The worksheet the values were read from.
+
+    Returns:
+        pandas.DataFrame: A DataFrame containing the data from the worksheet.
+    """
+    if values_list:
+        return pd.DataFrame(values_list[1:], columns=values_list[0])
+    return pd.DataFrame(columns=worksheet.row_values(1))
+
+
+def report_sheet_error(error):
+    """
+    Shows a user friendly error message for a failed Google Sheets request.
+
+    Params:
+        error (Exception): The exception raised by gspread.
+
+    Returns:
+        None
+    """
+    if isinstance(error, gspread.exceptions.SpreadsheetNotFound):
+        st.error('Das angegebene Google Sheet konnte nicht gefunden werden. Überprüfen Sie die Sheet-ID und versuchen Sie es erneut.')
+    elif isinstance(error, gspread.exceptions.WorksheetNotFound):
+        st.error('Das angegebene Arbeitsblatt konnte nicht gefunden werden. Überprüfen Sie, ob das Arbeitsblatt existiert.')
+    elif isinstance(error, gspread.exceptions.APIError):
+        st.error('Es ist ein API-Fehler aufgetreten. Bitte versuchen Sie es später erneut.')
+    else:
+        st.error('Ein unerwarteter Fehler ist aufgetreten. Bitte versuchen Sie es später erneut.')
+
+
+def open_worksheet(sheet_id, secrets, worksheet_name=None):
+    """
+    Opens a worksheet without reading its values, e.g. to write to a sheet served from the snapshot cache.
+
+    Params:
+        sheet_id (str): The ID of the Google Sheet.
+        secrets (str): A JSON string containing the service account credentials.
+        worksheet_name (str): The title of the worksheet | None for the first worksheet.
+
+    Returns:
+        gspread.models.Worksheet: The worksheet object representing the Google Sheet | None if an error occurred.
+    """
+    try:
+        client = gspread.authorize(load_credentials(secrets))
+        sheet = client.open_by_key(sheet_id)
+        return sheet.worksheet(worksheet_name) if worksheet_name else sheet.sheet1
+    
+    except gspread.exceptions.GSpreadException as error:
+        report_sheet_error(error)
+        return None
+
+
+def load_sheet_data(sheet_id, secrets, worksheet_name=None):
     """
     Loads data from a Google Sheet and returns it as a Pandas DataFrame along with the worksheet object.
 
@@ -37,6 +114,7 @@ def load_sheet_data(sheet_id, secrets):
     Params:
         sheet_id (str): The ID of the Google Sheet to load data from.
         secrets (str): A JSON string containing the service account credentials.
+        worksheet_name (str): The title of the worksheet to read | None for the first worksheet.
 
     Returns:
         tuple: A tuple containing:
@@ -46,29 +124,9 @@ def load_sheet_data(sheet_id, secrets):
     try:
         creds = load_credentials(secrets)
         client = gspread.authorize(creds)
-        sheet = client.open_by_key(sheet_id)
-        worksheet = sheet.sheet1
-        values_list = worksheet.get_all_values()
-        
-        if values_list:
-            df = pd.DataFrame(values_list[1:], columns=values_list[0])
-        else:
-            df = pd.DataFrame(columns=worksheet.row_values(1))
-            
-        return df, worksheet
-    
-    except gspread.exceptions.SpreadsheetNotFound:
-        st.error('Das angegebene Google Sheet konnte nicht gefunden werden. Überprüfen Sie die Sheet-ID und versuchen Sie es erneut.')
-        return pd.DataFrame(), None
-    
-    except gspread.exceptions.WorksheetNotFound:
-        st.error('Das angegebene Arbeitsblatt konnte nicht gefunden werden. Überprüfen Sie, ob das Arbeitsblatt existiert.')
-        return pd.DataFrame(), None
-    
-    except gspread.exceptions.APIError as api_error:
-        st.error(f'Es ist ein API-Fehler aufgetreten. Bitte versuchen Sie es später erneut.')
-        return pd.DataFrame(), None
+        values_list, worksheet = fetch_worksheet(client, sheet_id, worksheet_name)
+        return values_to_df(values_list, worksheet), worksheet
     
-    except gspread.exceptions.Exception as e:
-        st.error(f'Ein unerwarteter Fehler ist aufgetreten. Bitte versuchen Sie es später erneut.')
+    except gspread.exceptions.GSpreadException as error:
+        report_sheet_error(error)
         return pd.DataFrame(), None
@@ -0,0 +1,163 @@
+from .snapshot import cached_per_snapshot
+
+
+class Recipe:
+    """
+    A recipe of the snapshot, a compact record instead of a pandas row.
+    """
+    __slots__ = ('position', 'name', 'category', 'nutrition', 'duration', 'ingredients', 'preparation')
+    FIELDS = {
+        'name': 'Gericht',
+        'category': 'Kategorie',
+        'nutrition': 'Ernährungsweise',
+        'duration': 'Dauer',
+        'ingredients': 'Zutaten',
+        'preparation': 'Zubereitung'
+    }
+    KEY = 'name'
+
+    def __init__(self, position, name, category, nutrition, duration, ingredients, preparation):
+        self.position = position
+        self.name = name
+        self.category = category
+        self.nutrition = nutrition
+        self.duration = duration
+        self.ingredients = ingredients
+        self.preparation = preparation
+
+
+class User:
+    """
+    A user of the snapshot, a compact record instead of a pandas row.
+    """
+    __slots__ = ('position', 'username', 'email', 'name', 'password', 'role')
+    FIELDS = {
+        'username': 'username',
+        'email': 'email',
+        'name': 'name',
+        'password': 'password',
+        'role': 'role'
+    }
+    KEY = 'username'
+
+    def __init__(self, position, username, email, name, password, role):
+        self.position = position
+        self.username = username
+        self.email = email
+        self.name = name
+        self.password = password
+        self.role = role
+
+    def credentials(self):
+        """
+        Returns the entry of the user in the credentials of the authenticator.
+
+        Returns:
+            dict: The email, name, password and role of the user.
+        """
+        return {'email': self.email, 'name': self.name, 'password': self.password, 'role': self.role}
+
+    def row(self):
+        """
+        Returns the user as a row of the user sheet.
+
+        Returns:
+            list: The username, email, name, password and role of the user.
+        """
+        return [self.username, self.email, self.name, self.password, self.role]
+
+
+class RecordStore:
+    """
+    A column store over a snapshot that hands out typed records.
+
+    The fields stay in the columns of the snapshot, for a shared snapshot these are the Arrow backed
+    columns of the memory-mapped file, and are only read for the rows that are actually requested.
+    Only a dict from the key of the record type ('Gericht' for recipes, 'username' for users) to its
+    row position is built, so lookups are O(1).
+    """
+
+    def __init__(self, record_type, df):
+        """
+        Params:
+            record_type (type): Either Recipe | User.
+            df (pandas.DataFrame): The snapshot.
+        """
+        self.record_type = record_type
+        # None for a column missing in the sheet
+        self.columns = {
+            field: df[column].array if column in df.columns else None
+            for field, column in record_type.FIELDS.items()
+        }
+        self._length = len(df)
+        keys = self.columns[record_type.KEY]
+        # The first row wins for duplicate keys, like a search in the sheet
+        self._positions = {}
+        for position, key in enumerate(keys if keys is not None else ()):
+            self._positions.setdefault(key, position)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return self.records(range(len(self)))
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def keys(self):
+        return list(self._positions)
+
+    def at(self, position):
+        """
+        Returns the record at a row position.
+
+        Params:
+            position (int): The row position in the snapshot.
+
+        Returns:
+            Recipe | User: The record.
+        """
+        return self.record_type(position, *(
+            values[position] if values is not None else '' for values in self.columns.values()
+        ))
+
+    def get(self, key):
+        """
+        Returns the record with the given key.
+
+        Params:
+            key (str): The name of the recipe | the username.
+
+        Returns:
+            Recipe | User: The record | None if there is no such record.
+        """
+        position = self._positions.get(key)
+        return None if position is None else self.at(position)
+
+    def records(self, positions):
+        """
+        Yields the records at the given row positions.
+
+        Params:
+            positions (iterable): The row positions in the snapshot.
+
+        Yields:
+            Recipe | User: The records.
+        """
+        for position in positions:
+            yield self.at(int(position))
+
+
+def get_record_store(df, record_type):
+    """
+    Returns the record store of a snapshot, built once per snapshot version.
+
+    Params:
+        df (pandas.DataFrame): The snapshot.
+        record_type (type): Either Recipe | User.
+
+    Returns:
+        RecordStore: The record store of the snapshot.
+    """
+    return cached_per_snapshot(df, f'records.{record_type.__name__}', lambda _: RecordStore(record_type, df))
@@ -0,0 +1,211 @@
+import gspread
+import pandas as pd
+import streamlit as st
+
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .db import load_credentials, fetch_worksheet, values_to_df, report_sheet_error
+from .records import Recipe
+
+
+# Header of a table whose shards are all still empty
+DEFAULT_COLUMNS = list(Recipe.FIELDS.values())
+
+
+class ShardedWorksheet:
+    """
+    Spreads the rows of one logical table over several worksheets according to a shard manifest.
+
+    The manifest (see `recipe_shards` in config.yaml) lists the shards and the strategy used to assign a row:
+    - 'hash': the row goes to shard crc32(key) % number_of_shards, where key is the normalized value of `key`.
+    - 'category': the row goes to the first shard whose `categories` contain the value of `key`,
+      or to the shard without `categories` (the fallback shard).
+
+    The object offers the write methods used by the app (`append_row`, `append_rows`) and routes them
+    to the worksheet that owns the row, so callers can use it like a single worksheet.
+    """
+
+    def __init__(self, worksheets, manifest, columns=None):
+        """
+        Params:
+            worksheets (list): The gspread worksheets, in the order of the shards in the manifest.
+            manifest (dict): The shard manifest.
+            columns (list): The header of the table, used to map row values to column names | None to read it on first use
+                from the first shard that has one.
+        """
+        self.worksheets = worksheets
+        self.shards = manifest['shards']
+        self.strategy = manifest.get('strategy', 'hash')
+        self.key = manifest.get('key', 'Gericht' if self.strategy == 'hash' else 'Kategorie')
+        self._columns = list(columns) if columns is not None else None
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            headers = (worksheet.row_values(1) for worksheet in self.worksheets)
+            self._columns = next((header for header in headers if header), DEFAULT_COLUMNS)
+        return self._columns
+
+    def shard_index(self, record):
+        """
+        Returns the index of the shard that owns a row.
+
+        Params:
+            record (dict | list): The row, either as a dict of column values or as a list in column order.
+
+        Returns:
+            int: The index of the owning shard.
+        """
+        if not isinstance(record, dict):
+            record = dict(zip(self.columns, record))
+        value = str(record.get(self.key, '')).strip()
+
+        if self.strategy == 'category':
+            fallback = 0
+            for index, shard in enumerate(self.shards):
+                categories = shard.get('categories')
+                if not categories:
+                    fallback = index
+                elif value in categories:
+                    return index
+            return fallback
+
+        return zlib.crc32(value.lower().encode('utf-8')) % len(self.shards)
+
+    def route(self, record):
+        """
+        Returns the worksheet that owns a row.
+
+        Params:
+            record (dict | list): The row, either as a dict of column values or as a list in column order.
+
+        Returns:
+            gspread.models.Worksheet: The worksheet of the owning shard.
+        """
+        return self.worksheets[self.shard_index(record)]
+
+    def append_row(self, values, **kwargs):
+        return self.route(values).append_row(values, **kwargs)
+
+    def group_rows(self, rows):
+        """
+        Groups rows by their owning shard.
+
+        Params:
+            rows (list): The rows, each as a list in column order.
+
+        Returns:
+            list: Tuples of the worksheet of a shard and the rows it owns.
+        """
+        grouped = {}
+        for values in rows:
+            grouped.setdefault(self.shard_index(values), []).append(values)
+        return [(self.worksheets[index], shard_rows) for index, shard_rows in grouped.items()]
+
+    def append_rows(self, rows, **kwargs):
+        """
+        Appends rows in one request per shard.
+
+        Params:
+            rows (list): The rows to append, each as a list in column order.
+
+        Returns:
+            None
+        """
+        for worksheet, shard_rows in self.group_rows(rows):
+            worksheet.append_rows(shard_rows, **kwargs)
+
+    def locate(self, value):
+        """
+        Finds the shard and cell containing a value.
+
+        With the hash strategy on the searched column only the owning shard is queried,
+        otherwise all shards are searched in parallel.
+
+        Params:
+            value (str): The value to search for, e.g. the name of a recipe.
+
+        Returns:
+            tuple: A tuple containing the worksheet and the gspread cell, or (None, None) if the value was not found.
+        """
+        if self.strategy == 'hash' and self.key == self.columns[0]:
+            worksheet = self.route({self.key: value})
+            cell = worksheet.find(value)
+            return (worksheet, cell) if cell else (None, None)
+
+        with ThreadPoolExecutor(max_workers=len(self.worksheets)) as pool:
+            cells = list(pool.map(lambda worksheet: worksheet.find(value), self.worksheets))
+        for worksheet, cell in zip(self.worksheets, cells):
+            if cell:
+                return worksheet, cell
+        return None, None
+
+
+def load_sharded_sheet_data(manifest, secrets):
+    """
+    Loads all shards listed in the manifest in parallel and merges them into one DataFrame.
+
+    Every shard is fetched in its own thread, so the read latency is bounded by the largest shard
+    instead of the size of the whole collection.
+
+    Params:
+        manifest (dict): The shard manifest, containing the list of `shards` with `sheet_id` and optional `worksheet`.
+        secrets (str): A JSON string containing the service account credentials.
+
+    Returns:
+        tuple: A tuple containing:
+            - pandas.DataFrame: A DataFrame containing the rows of all shards.
+            - ShardedWorksheet: The object routing writes to the owning shard.
+    """
+    try:
+        creds = load_credentials(secrets)
+        client = gspread.authorize(creds)
+        shards = manifest['shards']
+
+        with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+            results = list(pool.map(
+                lambda shard: fetch_worksheet(client, shard['sheet_id'], shard.get('worksheet')),
+                shards
+            ))
+
+        # Empty shards have no header, the others have to agree on it
+        headers = {tuple(values_list[0]) for values_list, _ in results if values_list}
+        if len(headers) > 1:
+            st.error('Die Shards des Rezept-Sheets haben unterschiedliche Spalten. Bitte gleichen Sie die Kopfzeilen an.')
+            return pd.DataFrame(), None
+        columns = list(headers.pop()) if headers else DEFAULT_COLUMNS
+
+        frames = [values_to_df(values_list, worksheet) for values_list, worksheet in results]
+        df = pd.concat([frame.reindex(columns=columns) for frame in frames], ignore_index=True)
+
+        worksheets = [worksheet for _, worksheet in results]
+        return df, ShardedWorksheet(worksheets, manifest, columns)
+
+    except gspread.exceptions.GSpreadException as error:
+        report_sheet_error(error)
+        return pd.DataFrame(), None
+
+
+def open_sharded_worksheet(manifest, secrets):
+    """
+    Opens all shards listed in the manifest without reading their values.
+
+    Params:
+        manifest (dict): The shard manifest, containing the list of `shards` with `sheet_id` and optional `worksheet`.
+        secrets (str): A JSON string containing the service account credentials.
+
+    Returns:
+        ShardedWorksheet: The object routing writes to the owning shard | None if an error occurred.
+    """
+    try:
+        client = gspread.authorize(load_credentials(secrets))
+        worksheets = []
+        for shard in manifest['shards']:
+            sheet = client.open_by_key(shard['sheet_id'])
+            worksheets.append(sheet.worksheet(shard['worksheet']) if shard.get('worksheet') else sheet.sheet1)
+        return ShardedWorksheet(worksheets, manifest)
+
+    except gspread.exceptions.GSpreadException as error:
+        report_sheet_error(error)
+        return None
@@ -0,0 +1,367 @@
+import pandas as pd
+import pyarrow as pa
+
+import hashlib
+import mmap
+import os
+import stat as stat_module
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process refreshes on its own
+    fcntl = None
+
+
+DEFAULT_DIRECTORY = os.path.join(tempfile.gettempdir(), 'easy_eat')
+DEFAULT_TTL_SECONDS = 60
+# Invalidated snapshots get an mtime counting up from the epoch, real writes are far above this
+INVALIDATED_BEFORE = 10 ** 9
+NOFOLLOW = getattr(os, 'O_NOFOLLOW', 0)
+
+_snapshots = {}
+_worksheets = {}
+_registry_lock = threading.Lock()
+_derived = {}
+_derived_locks = {}
+
+
+class SharedSnapshot:
+    """
+    A snapshot of a sheet shared by all server processes on one host.
+
+    The data is stored as an Arrow IPC file whose schema metadata holds the version header.
+    Every process memory-maps the file and reads it without copying: the Arrow table stays the backing
+    store and the pandas view uses Arrow backed columns on top of it, built once per version and process
+    instead of once per rerun. The file is only readable by the owner of the server processes, as the user
+    snapshot contains the password hashes. When the file is older than the TTL, the process that wins
+    the file lock fetches the sheet and atomically replaces the file, while all others keep serving the
+    current version. The Google Sheets traffic therefore stays the same regardless of the number of replicas.
+    """
+
+    def __init__(self, name, directory=DEFAULT_DIRECTORY, ttl=DEFAULT_TTL_SECONDS):
+        """
+        Params:
+            name (str): The name of the snapshot, e.g. 'recipes' or 'users'.
+            directory (str): The directory holding the snapshot and lock files.
+            ttl (int): The age in seconds after which the snapshot is refreshed.
+        """
+        _private_directory(directory)
+        self.name = name
+        self.path = os.path.join(directory, f'{name}.arrow')
+        self.lock_path = f'{self.path}.lock'
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._file_key = None
+        self._df = None
+        self._table = None
+        self._mmap = None
+
+    def get(self, fetch, fresh=False):
+        """
+        Returns the current snapshot, refreshing it first if it is missing or stale.
+
+        Params:
+            fetch (callable): Loads the sheet and returns a DataFrame, or None if loading failed.
+            fresh (bool): Waits for the lock and fetches the sheet even if the snapshot is not stale yet.
+
+        Returns:
+            pandas.DataFrame: The snapshot | None if there is no snapshot and loading failed, or if a fresh fetch failed.
+        """
+        stat = self._stat()
+        if fresh:
+            # Callers asking for fresh data must not silently get the old version
+            if not self._refresh(fetch, wait=True, force=True):
+                return None
+        elif stat is None or self._is_stale(stat):
+            # Without any snapshot we have to wait for the refreshing process, otherwise we serve the old version
+            self._refresh(fetch, wait=stat is None)
+        return self.read()
+
+    def invalidate(self):
+        """
+        Marks the snapshot as stale, so the next read in any process triggers a refresh.
+
+        Every invalidation sets a different mtime, so a refresh running meanwhile notices it.
+
+        Returns:
+            None
+        """
+        stat = self._stat()
+        if stat is None:
+            return
+        generation = int(stat.st_mtime) + 1 if stat.st_mtime < INVALIDATED_BEFORE else 1
+        try:
+            os.utime(self.path, (generation, generation))
+        except FileNotFoundError:
+            pass
+
+    def _stat(self):
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    def _is_stale(self, stat):
+        return time.time() - stat.st_mtime > self.ttl
+
+    def _refresh(self, fetch, wait, force=False):
+        with os.fdopen(os.open(self.lock_path, os.O_WRONLY | os.O_CREAT | NOFOLLOW, 0o600), 'w') as lock_file:
+            if not _acquire(lock_file, wait):
+                return False
+            try:
+                # Another process may have refreshed while we were waiting for the lock
+                stat = self._stat()
+                if not force and stat is not None and not self._is_stale(stat):
+                    return False
+                df = fetch()
+                if df is None:
+                    return False
+                self._write(df, stat.st_mtime_ns if stat is not None else None)
+                return True
+            finally:
+                _release(lock_file)
+
+    def _write(self, df, seen_mtime):
+        """
+        Atomically replaces the snapshot file.
+
+        Params:
+            df (pandas.DataFrame): The freshly fetched sheet.
+            seen_mtime (int): The mtime of the snapshot file before the fetch started | None if there was no file.
+        """
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({'version': _new_version(df), 'created': str(time.time())})
+
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | NOFOLLOW, 0o600), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        # An invalidation during the fetch must survive the replace, otherwise it is hidden for a full TTL
+        stat = self._stat()
+        invalidated = stat is not None and stat.st_mtime_ns != seen_mtime
+        os.replace(tmp_path, self.path)
+        if invalidated:
+            self.invalidate()
+
+    def read(self):
+        """
+        Returns the current snapshot without ever refreshing it, e.g. for read-only consumers.
+
+        The columns of the DataFrame are Arrow backed and point into the memory-mapped file.
+
+        Returns:
+            pandas.DataFrame: The snapshot | None if no process has written a snapshot yet.
+        """
+        stat = self._stat()
+        if stat is None:
+            return None
+
+        file_key = (stat.st_ino, stat.st_size)
+        with self._lock:
+            if file_key != self._file_key:
+                try:
+                    fd = os.open(self.path, os.O_RDONLY | NOFOLLOW)
+                except FileNotFoundError:
+                    return self._df
+                try:
+                    opened = os.fstat(fd)
+                    file_key = (opened.st_ino, opened.st_size)
+                    source = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+                finally:
+                    os.close(fd)
+                table = pa.ipc.open_file(pa.BufferReader(pa.py_buffer(source))).read_all()
+                df = table.to_pandas(types_mapper=pd.ArrowDtype)
+                df.attrs['snapshot'] = self.name
+                df.attrs['snapshot_version'] = table.schema.metadata.get(b'version', b'').decode()
+                self._mmap, self._table, self._df, self._file_key = source, table, df, file_key
+            return self._df
+
+    def table(self, version):
+        """
+        Returns the memory-mapped Arrow table of a snapshot version, e.g. to query it without a copy.
+
+        Params:
+            version (str): The snapshot version, as in `df.attrs['snapshot_version']`.
+
+        Returns:
+            pyarrow.Table: The table | None if the process no longer holds this version.
+        """
+        with self._lock:
+            if self._df is not None and self._df.attrs['snapshot_version'] == version:
+                return self._table
+            return None
+
+
+def _private_directory(directory):
+    # The snapshots are the credential store of the app, a directory someone else can write to must not be used
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+    stat = os.lstat(directory)
+    if not stat_module.S_ISDIR(stat.st_mode) or stat.st_uid != os.getuid() or stat_module.S_IMODE(stat.st_mode) != 0o700:
+        raise PermissionError(
+            f'Das Snapshot-Verzeichnis {directory} muss ein Verzeichnis des aktuellen Users mit den Rechten 0700 sein.'
+        )
+
+
+def _new_version(df):
+    # Nanoseconds plus a content hash never repeat, even if the file was deleted or two processes wrote at once
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()
+    return f'{time.time_ns():x}-{digest[:12]}'
+
+
+def _acquire(lock_file, blocking):
+    if fcntl is None:
+        return True
+    flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+    try:
+        fcntl.flock(lock_file, flags)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _release(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def get_snapshot(name, settings=None):
+    """
+    Returns the process-wide shared snapshot with the given name.
+
+    Params:
+        name (str): The name of the snapshot, e.g. 'recipes' or 'users'.
+        settings (dict): The `snapshot_cache` section of config.yaml | None for the defaults.
+
+    Returns:
+        SharedSnapshot: The shared snapshot.
+    """
+    settings = settings or {}
+    with _registry_lock:
+        if name not in _snapshots:
+            _snapshots[name] = SharedSnapshot(
+                name,
+                directory=settings.get('directory', DEFAULT_DIRECTORY),
+                ttl=settings.get('ttl_seconds', DEFAULT_TTL_SECONDS)
+            )
+        return _snapshots[name]
+
+
+def invalidate_snapshot(name):
+    """
+    Marks the shared snapshot with the given name as stale after a write to its sheet.
+
+    Params:
+        name (str): The name of the snapshot, e.g. 'recipes' or 'users'.
+
+    Returns:
+        None
+    """
+    snapshot = _snapshots.get(name)
+    if snapshot is not None:
+        snapshot.invalidate()
+
+
+def snapshot_table(df):
+    """
+    Returns the memory-mapped Arrow table behind a snapshot DataFrame.
+
+    Params:
+        df (pandas.DataFrame): A DataFrame returned by a shared snapshot.
+
+    Returns:
+        pyarrow.Table: The table of the same snapshot version | None if the DataFrame is not (or no longer) backed by one.
+    """
+    snapshot = _snapshots.get(df.attrs.get('snapshot'))
+    version = df.attrs.get('snapshot_version')
+    if snapshot is None or version is None:
+        return None
+    return snapshot.table(version)
+
+
+def cached_per_version(snapshot, version, name, build):
+    """
+    Returns a value derived from a snapshot version, built once per version and process.
+
+    Only the value of the latest version is kept. It is handed to `build` when a new version is seen,
+    so derived structures can be updated incrementally instead of being rebuilt.
+
+    Params:
+        snapshot (str): The name of the snapshot, e.g. 'recipes'.
+        version (str): The snapshot version | None to build the value without caching it.
+        name (str): The name of the derived value, e.g. 'ingredient_index'.
+        build (callable): Receives the value of the previous version or None, returns the value of this version.
+
+    Returns:
+        object: The derived value.
+    """
+    if version is None:
+        return build(None)
+
+    key = (snapshot, name)
+    with _registry_lock:
+        lock = _derived_locks.setdefault(key, threading.Lock())
+    # One lock per derived value, a slow build must not block the others
+    with lock:
+        entry = _derived.get(key)
+        if entry is None or entry[0] != version:
+            entry = _derived[key] = (version, build(entry[1] if entry is not None else None))
+        return entry[1]
+
+
+def cached_per_snapshot(df, name, build):
+    """
+    Returns a value derived from a snapshot DataFrame, see `cached_per_version`.
+
+    Params:
+        df (pandas.DataFrame): The snapshot | any other DataFrame to build the value without caching it.
+        name (str): The name of the derived value, e.g. 'ingredient_index'.
+        build (callable): Receives the value of the previous version or None, returns the value of this version.
+
+    Returns:
+        object: The derived value.
+    """
+    return cached_per_version(df.attrs.get('snapshot'), df.attrs.get('snapshot_version'), name, build)
+
+
+def load_shared_sheet_data(name, load, open_worksheet, settings=None, fresh=False):
+    """
+    Loads a sheet through the shared snapshot cache.
+
+    The sheet is only fetched by the process refreshing the snapshot. The worksheet object needed
+    for writes is opened once per process and reused afterwards.
+
+    Params:
+        name (str): The name of the snapshot, e.g. 'recipes' or 'users'.
+        load (callable): Loads the sheet and returns a tuple (DataFrame, worksheet), like `load_sheet_data`.
+        open_worksheet (callable): Opens the worksheet without reading its values, returns None on failure.
+        settings (dict): The `snapshot_cache` section of config.yaml | None for the defaults.
+        fresh (bool): Fetches the sheet even if the snapshot is not stale yet, e.g. before a bulk import.
+            If that fetch fails, no worksheet is returned.
+
+    Returns:
+        tuple: A tuple containing:
+            - pandas.DataFrame: The snapshot of the sheet.
+            - gspread.models.Worksheet: The worksheet object representing the Google Sheet.
+    """
+    def fetch():
+        df, worksheet = load()
+        if worksheet is None:
+            return None
+        _worksheets[name] = worksheet
+        return df
+
+    df = get_snapshot(name, settings).get(fetch, fresh)
+    if df is None:
+        return pd.DataFrame(), None
+
+    if name not in _worksheets:
+        worksheet = open_worksheet()
+        if worksheet is not None:
+            _worksheets[name] = worksheet
+    return df, _worksheets.get(name)
@@ -1,2 +1,5 @@
 from .recipe_management import load_recipe
-from .handlers import handle_search, handle_optional_search, handle_add_recipe, handle_delete_recipe
\ No newline at end of file
+from .handlers import handle_search, handle_optional_search, handle_advanced_filter, handle_ingredient_search, handle_add_recipe, handle_delete_recipe
+from .ingredients import parse_ingredients, get_ingredient_index
+from .similarity import get_similarity_engine
+from .query import make_filter, query_recipes
\ No newline at end of file
@@ -0,0 +1,200 @@
+import gspread
+
+import csv
+import json
+import os
+import time
+
+from database import invalidate_snapshot
+
+from .recipe_management import RECIPE_COLUMNS, validate_recipe
+
+
+# Google Sheets allows 60 write requests per minute and user
+MIN_REQUEST_INTERVAL = 1.0
+MAX_BACKOFF = 64
+
+
+def read_recipes(path):
+    """
+    Streams recipes from a CSV file (header = column names) or a JSON Lines file (one object per line).
+
+    Params:
+        path (str): The path of the file, the format is detected by the extension '.csv' or '.jsonl'.
+
+    Yields:
+        dict: One recipe per record | None for a line that is no JSON object.
+    """
+    # utf-8-sig drops the byte order mark of Excel exports, which would otherwise end up in the first column name
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    yield record if isinstance(record, dict) else None
+
+
+def normalize_recipe(record):
+    """
+    Normalizes an imported record like the recipe form does.
+
+    Params:
+        record (dict): The raw record.
+
+    Returns:
+        dict: The recipe with the keys of RECIPE_COLUMNS.
+    """
+    recipe = {column: str(record.get(column) or '').strip() for column in RECIPE_COLUMNS}
+    recipe['Gericht'] = recipe['Gericht'].title()
+    return recipe
+
+
+def _load_checkpoint(checkpoint_path, source):
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding='utf-8') as file:
+            checkpoint = json.load(file)
+        if checkpoint.get('source') == os.path.abspath(source):
+            return checkpoint['processed']
+    return 0
+
+
+def _save_checkpoint(checkpoint_path, source, processed):
+    if checkpoint_path:
+        tmp_path = f'{checkpoint_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'source': os.path.abspath(source), 'processed': processed}, file)
+        os.replace(tmp_path, checkpoint_path)
+
+
+def _requests(worksheet, rows):
+    # A sharded worksheet needs one request per shard, each of them is paced and retried on its own
+    if hasattr(worksheet, 'group_rows'):
+        return worksheet.group_rows(rows)
+    return [(worksheet, rows)]
+
+
+def _append_with_backoff(worksheet, rows, last_request):
+    # Keeps at most one write request per MIN_REQUEST_INTERVAL and backs off when the quota is exceeded
+    backoff = 2
+    while True:
+        wait = MIN_REQUEST_INTERVAL - (time.monotonic() - last_request)
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            last_request = time.monotonic()
+            worksheet.append_rows(rows)
+            return last_request
+        except gspread.exceptions.APIError as api_error:
+            if api_error.response.status_code != 429 or backoff > MAX_BACKOFF:
+                raise
+            time.sleep(backoff)
+            backoff *= 2
+
+
+def import_recipes(worksheet, df, path, chunk_size=500, checkpoint_path=None, log=print):
+    """
+    Imports recipes from a CSV or JSON Lines file in chunked `append_rows` requests.
+
+    Every recipe is validated with the rules of the recipe form and skipped if its name already exists
+    in the snapshot or earlier in the file. After every written chunk the shared snapshot is invalidated
+    and the number of processed records is stored in the checkpoint file, so an interrupted import
+    continues where it stopped. `df` should be freshly fetched, as rows written after the last
+    checkpoint are only skipped as duplicates then.
+
+    Params:
+        worksheet (gspread.models.Worksheet | database.ShardedWorksheet): The worksheet object representing the Google Sheet.
+        df (pandas.DataFrame): The snapshot of the recipes, used to skip duplicates.
+        path (str): The path of the CSV or JSON Lines file.
+        chunk_size (int): The number of rows written per request.
+        checkpoint_path (str): The path of the checkpoint file | None to disable resuming.
+        log (callable): Receives progress and validation messages.
+
+    Returns:
+        dict: The number of 'imported', 'duplicate' and 'invalid' records.
+    """
+    existing = {name.strip().lower() for name in df.get('Gericht', ())}
+    skip = _load_checkpoint(checkpoint_path, path)
+    if skip:
+        log(f'Setze Import nach {skip} Datensätzen fort.')
+
+    stats = {'imported': 0, 'duplicate': 0, 'invalid': 0}
+    chunk, processed, last_request = [], skip, 0.0
+
+    def flush():
+        nonlocal chunk, last_request
+        if not chunk:
+            _save_checkpoint(checkpoint_path, path, processed)
+            return
+        written = False
+        try:
+            for target, rows in _requests(worksheet, chunk):
+                last_request = _append_with_backoff(target, rows, last_request)
+                written = True
+        finally:
+            # Also after a partial write, so no reader keeps missing the rows
+            if written:
+                invalidate_snapshot('recipes')
+        stats['imported'] += len(chunk)
+        chunk = []
+        _save_checkpoint(checkpoint_path, path, processed)
+        log(f"{processed} Datensätze verarbeitet, {stats['imported']} importiert.")
+
+    for number, record in enumerate(read_recipes(path), start=1):
+        if number <= skip:
+            continue
+
+        if record is None:
+            stats['invalid'] += 1
+            log(f'Datensatz {number} übersprungen: kein gültiges JSON-Objekt')
+            processed = number
+            continue
+
+        recipe = normalize_recipe(record)
+        errors = validate_recipe(recipe)
+        key = recipe['Gericht'].lower()
+        if errors:
+            stats['invalid'] += 1
+            log(f"Datensatz {number} übersprungen: {', '.join(errors)}")
+        elif key in existing:
+            stats['duplicate'] += 1
+        else:
+            existing.add(key)
+            chunk.append([recipe[column] for column in RECIPE_COLUMNS])
+
+        processed = number
+        if len(chunk) >= chunk_size:
+            flush()
+
+    flush()
+    return stats
+
+
+def export_recipes(df, file, file_format='csv'):
+    """
+    Streams the recipes of a snapshot into a CSV or JSON Lines file, row by row.
+
+    Params:
+        df (pandas.DataFrame): The snapshot of the recipes.
+        file (io.TextIOBase): The opened output file.
+        file_format (str): Either 'csv' | 'jsonl'.
+
+    Returns:
+        int: The number of exported recipes.
+    """
+    columns = [column for column in RECIPE_COLUMNS if column in df.columns]
+    if file_format == 'csv':
+        writer = csv.writer(file)
+        writer.writerow(columns)
+    count = 0
+    for values in df[columns].itertuples(index=False, name=None):
+        if file_format == 'csv':
+            writer.writerow(values)
+        else:
+            file.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False) + '\n')
+        count += 1
+    return count
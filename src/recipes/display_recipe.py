@@ -1,30 +1,69 @@
 import streamlit as st
 
+from database import cached_per_version
 
-def display_recipe(df):
+
+def render_recipe_card(recipe, similar=None):
+    """
+    Renders a recipe into one markdown block.
+
+    Params:
+        recipe (database.Recipe): The recipe to render.
+        similar (list): The names of similar recipes | None.
+
+    Returns:
+        str: The markdown of the recipe card.
+    """
+    card = (
+        f"# {recipe.name}\n\n"
+        f"### Dauer:\n\n{recipe.duration}\n\n"
+        f"### Kategorie:\n\n{recipe.category}\n\n"
+        f"### Zutaten:\n\n{recipe.ingredients}\n\n"
+        f"### Zubereitung:\n\n{recipe.preparation}\n\n"
+    )
+    if similar:
+        card += f":gray[Ähnliche Rezepte: {', '.join(similar)}]\n\n"
+    return card + "---"
+
+
+def get_recipe_card(recipe, engine=None, version=None):
+    """
+    Returns the rendered card of a recipe, memoized per (recipe, snapshot version).
+
+    Params:
+        recipe (database.Recipe): The recipe to render.
+        engine (recipes.similarity.SimilarityEngine): The similarity engine of the snapshot | None.
+        version (str): The snapshot version of the recipe | None to render without memoizing.
+
+    Returns:
+        str: The markdown of the recipe card.
+    """
+    cards = cached_per_version('recipes', version, 'recipe_cards', lambda _: {})
+    key = (recipe.position, engine is not None)
+    card = cards.get(key)
+    if card is None:
+        # The similar recipes are only looked up for cards that are actually rendered
+        similar = engine.similar(recipe.name) if engine is not None else None
+        card = cards[key] = render_recipe_card(recipe, similar)
+    return card
+
+
+def display_recipe(recipes, engine=None, version=None):
     """
-    Displays recipe details from a DataFrame.
+    Displays recipe details.
 
-    This function takes a DataFrame containing recipe information 
-    and iterates through each row to display the details of each recipe, 
+    This function takes recipe records and displays the details of each recipe, 
     such as the title, duration, category, ingredients, and preparation steps. 
-    The details are shown using Streamlit components.
+    Each recipe is pre-rendered into one markdown card and sent as a single Streamlit element.
+    If a similarity engine is given, the precomputed similar recipes are listed on the card.
 
     Params:
-        df (pd.DataFrame): DataFrame with columns 'Gericht', 'Dauer', 'Kategorie', 
-                           'Zutaten', and 'Zubereitung', containing recipe details.
+        recipes (iterable): The database.Recipe records to display, e.g. from `RecordStore.records`.
+        engine (recipes.similarity.SimilarityEngine): The similarity engine of the snapshot | None.
+        version (str): The snapshot version of the records, used to memoize the cards | None.
 
     Returns:
         None
     """
-    for _, row in df.iterrows():
-        st.title(row['Gericht'])
-        st.subheader('Dauer:')
-        st.write(row['Dauer'])
-        st.subheader('Kategorie:')
-        st.write(row['Kategorie'])
-        st.subheader('Zutaten:')
-        st.write(row['Zutaten'])
-        st.subheader('Zubereitung:')
-        st.write(row['Zubereitung'])
-        st.markdown("---")
\ No newline at end of file
+    for recipe in recipes:
+        st.markdown(get_recipe_card(recipe, engine, version))
\ No newline at end of file
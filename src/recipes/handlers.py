@@ -1,9 +1,28 @@
 import streamlit as st
+import numpy as np
 
-from utils import init_btn_session_state, toggle_btn_session_state, search, delete_row
+from database import get_record_store, Recipe
+from utils import init_btn_session_state, toggle_btn_session_state, search, delete_row, result_cache, normalize_query
 
-from .recipe_management import add_recipe
+from .recipe_management import add_recipe, validate_recipe, CATEGORIES, NUTRITIONS, DURATIONS
 from .display_recipe import display_recipe
+from .ingredients import get_ingredient_index
+from .similarity import get_similarity_engine
+from .query import FACETS, make_filter, query_recipes
+
+
+def display_rows(df, rows):
+    """
+    Displays the recipes at the given row positions of the snapshot, together with their similar recipes.
+
+    Params:
+        df (pandas.DataFrame): The DataFrame containing the recipe data.
+        rows (numpy.ndarray): The row positions of the recipes to display.
+
+    Returns:
+        None
+    """
+    display_recipe(get_record_store(df, Recipe).records(rows), get_similarity_engine(df), df.attrs.get('snapshot_version'))
 
 
 def handle_search(df):
@@ -13,6 +32,7 @@ def handle_search(df):
     This function prompts the user to input a search query for recipes, then filters
     the DataFrame based on the input. The results are displayed if any matching recipes
     are found; otherwise, a message is shown indicating that no recipes were found.
+    The matching rows are served from the result cache for repeated queries.
 
     Params:
         df (pandas.DataFrame): The DataFrame containing the recipe data.
@@ -23,11 +43,14 @@ def handle_search(df):
     search_input = st.text_input('Suche ein Rezept:', help='Suchparameter: Gericht | Zutaten').strip()
 
     if search_input:
-        filtered_df = search(df, search_input)
+        rows = result_cache.get_rows(
+            df, 'search', normalize_query(search_input),
+            lambda: df.index.get_indexer(search(df, search_input).index)
+        )
         
-        if not filtered_df.empty:
+        if rows.size:
             st.write(f"Rezepte mit '{search_input}':")
-            display_recipe(filtered_df)
+            display_rows(df, rows)
         else:
             st.write(f"Keine Rezepte gefunden mit '{search_input}'.")
 
@@ -60,12 +83,90 @@ def handle_optional_search(df):
             selected_value = st.selectbox(f'Filter nach {selected_column}:', unique_values, index=None)
 
             if selected_value:
-                filtered_df = df[df[selected_column] == selected_value]
-                display_recipe(filtered_df)
+                rows = result_cache.get_rows(
+                    df, 'filter', (selected_column, selected_value),
+                    lambda: np.flatnonzero((df[selected_column] == selected_value).to_numpy(dtype=bool, na_value=False))
+                )
+                display_rows(df, rows)
             else:
                 st.warning('Bitte wähle einen zweiten Filter!')
 
 
+def handle_advanced_filter(df):
+    """
+    Handles the advanced filter functionality within the application.
+
+    This function allows the user to combine several filters: accepted values for each facet
+    (category, nutrition, duration), search terms the recipe must contain and ingredients it must
+    not contain (e.g. "ohne Nüsse"). All selections are compiled into one DuckDB query over the snapshot.
+
+    Params:
+        df (pandas.DataFrame): The DataFrame containing the recipe data.
+
+    Returns:
+        None
+    """
+    init_btn_session_state('show_advanced_filter')
+    
+    if st.button('Erweiterter Filter'):
+        toggle_btn_session_state('show_advanced_filter')
+    
+    if st.session_state['show_advanced_filter']:
+        facets = {}
+        for column in FACETS:
+            if column in df.columns:
+                facets[column] = st.multiselect(f'{column}:', sorted(df[column].unique()), placeholder='Alle')
+        contains = st.text_input('Enthält:', help='Suchparameter: Gericht | Zutaten').strip()
+        excluded = st.text_input('Ohne:', placeholder='Nüsse, Sahne', help='Zutaten mit Komma trennen').strip()
+        
+        recipe_filter = make_filter(facets, contains, excluded)
+        if any(recipe_filter):
+            rows = result_cache.get_rows(df, 'advanced_filter', recipe_filter, lambda: query_recipes(df, recipe_filter))
+            if rows.size:
+                display_rows(df, rows)
+            else:
+                st.write('Keine Rezepte gefunden, die zu deinem Filter passen.')
+        else:
+            st.info('Bitte wähle mindestens einen Filter aus.')
+
+
+def handle_ingredient_search(df):
+    """
+    Handles the "cook with what I have" search within the application.
+
+    This function lets the user select the ingredients they have at home and how many ingredients
+    may be missing. The matching recipes are looked up in the ingredient index of the snapshot
+    and displayed, recipes lacking the fewest ingredients first.
+
+    Params:
+        df (pandas.DataFrame): The DataFrame containing the recipe data.
+
+    Returns:
+        None
+    """
+    init_btn_session_state('show_ingredient_search')
+    
+    if st.button('Kochen mit dem, was da ist'):
+        toggle_btn_session_state('show_ingredient_search')
+    
+    if st.session_state['show_ingredient_search']:
+        index = get_ingredient_index(df)
+        available = st.multiselect('Welche Zutaten hast du?', index.vocabulary, placeholder='Wähle deine Zutaten')
+        max_missing = st.number_input('Wie viele Zutaten dürfen fehlen?', min_value=0, max_value=10, value=2)
+        
+        if available:
+            rows = result_cache.get_rows(
+                df, 'ingredients', (tuple(sorted(available)), max_missing),
+                lambda: index.cookable(available, max_missing)[0]
+            )
+            if rows.size:
+                display_rows(df, rows)
+            else:
+                st.write('Keine passenden Rezepte gefunden.')
+        else:
+            st.info('Bitte wähle mindestens eine Zutat aus.')
+
+
 def handle_add_recipe(worksheet):
     """
     Handles the form submission for adding a new recipe to the Google Sheet.
@@ -85,9 +186,9 @@ def handle_add_recipe(worksheet):
         meal_name = st.text_input(label='Name des Gerichts', placeholder='Thunfisch Wraps').strip().title() 
         ingredients = st.text_area(label='Zutaten', placeholder='100g Thunfisch, 2 Blätter Salat, 1/4 Gurke...').strip() 
         
-        category = st.selectbox('Wähle eine Kategorie', ['Frühstück', 'Mittagessen', 'Abendessen', 'Beliebige Mahlzeit'], index=None, placeholder='Welche Mahlzeit passt zu deinem Rezept?')
-        nutrition = st.selectbox('Wähle eine Ernährungsweise:', ['vegan', 'vegetarisch', 'andere'], index=None, placeholder='Was ist die passende Ernährungsweise zu deinem Rezept?')
-        duration = st.selectbox('Wähle eine Option:', ['kurz', 'mittel', 'lang'], index=None, placeholder='Wie lange dauert dein Gericht?')
+        category = st.selectbox('Wähle eine Kategorie', CATEGORIES, index=None, placeholder='Welche Mahlzeit passt zu deinem Rezept?')
+        nutrition = st.selectbox('Wähle eine Ernährungsweise:', NUTRITIONS, index=None, placeholder='Was ist die passende Ernährungsweise zu deinem Rezept?')
+        duration = st.selectbox('Wähle eine Option:', DURATIONS, index=None, placeholder='Wie lange dauert dein Gericht?')
         preparation = st.text_area(label='Wie wird das Gericht zubereitet?', placeholder='Beschreibe die Zubereitung')
         
         confirm_submit = st.checkbox("Ja, ich habe alles überprüft und möchte das Rezept abschicken.")
@@ -97,10 +198,14 @@ def handle_add_recipe(worksheet):
             return
         
         if submitted:
+            errors = validate_recipe({
+                'Gericht': meal_name, 'Kategorie': category, 'Ernährungsweise': nutrition,
+                'Dauer': duration, 'Zutaten': ingredients, 'Zubereitung': preparation
+            })
             if not confirm_submit:
                 st.error('Bitte bestätigen Sie, dass Sie alles überprüft haben.')
-            elif not (meal_name and ingredients and category and nutrition and duration and preparation):
-                st.error('Bitte füllen Sie die Felder aus!')
+            elif errors:
+                st.error(f"Bitte füllen Sie die Felder aus! {', '.join(errors)}")
             else:
                 add_recipe(worksheet, meal_name, ingredients, category, nutrition, duration, preparation)
 
@@ -125,9 +230,9 @@ def handle_delete_recipe(df, worksheet):
     if df.empty:
         st.warning('Keine Rezepte zum Löschen, fügen Sie erst welche hinzu.')
     if delete_input:
-        value_to_delete = search(df, delete_input)
-        if not value_to_delete.empty:
-            st.write(value_to_delete)
+        recipe = get_record_store(df, Recipe).get(delete_input)
+        if recipe is not None:
+            display_recipe([recipe], version=df.attrs.get('snapshot_version'))
             if st.button('Löschen'):    
                 delete_row(worksheet, delete_input, entity_type='recipe') 
         else:
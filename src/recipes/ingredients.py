@@ -0,0 +1,171 @@
+import numpy as np
+
+import re
+from collections import namedtuple
+
+from database import cached_per_snapshot
+
+
+Ingredient = namedtuple('Ingredient', ['quantity', 'unit', 'name'])
+
+UNITS = {
+    'g': 'g', 'gr': 'g', 'gramm': 'g',
+    'kg': 'kg', 'mg': 'mg',
+    'ml': 'ml', 'cl': 'cl', 'dl': 'dl', 'l': 'l', 'liter': 'l',
+    'el': 'EL', 'esslöffel': 'EL',
+    'tl': 'TL', 'teelöffel': 'TL',
+    'prise': 'Prise', 'prisen': 'Prise',
+    'stück': 'Stück', 'stk': 'Stück',
+    'blatt': 'Blatt', 'blätter': 'Blatt',
+    'dose': 'Dose', 'dosen': 'Dose',
+    'packung': 'Packung', 'packungen': 'Packung', 'pck': 'Packung', 'päckchen': 'Packung',
+    'bund': 'Bund',
+    'zehe': 'Zehe', 'zehen': 'Zehe',
+    'scheibe': 'Scheibe', 'scheiben': 'Scheibe',
+    'tasse': 'Tasse', 'tassen': 'Tasse',
+    'becher': 'Becher',
+    'handvoll': 'Handvoll',
+    'etwas': 'etwas',
+}
+
+FRACTIONS = {'½': 0.5, '¼': 0.25, '¾': 0.75, '⅓': 1 / 3, '⅔': 2 / 3}
+
+# A comma only separates ingredients if it is not a decimal comma like in "1,5 kg"
+SEPARATOR = re.compile(r',(?!\d)|(?<!\d),|;|\n')
+NUMBER = r'(\d+(?:[.,]\d+)?(?:\s*/\s*\d+)?|[½¼¾⅓⅔])'
+# A range like "2-3 Tomaten" or "1 bis 2 EL Öl" counts with its mean
+QUANTITY = re.compile(rf'^\s*{NUMBER}(?:\s*[-–]\s*{NUMBER}|\s+bis\s+{NUMBER})?\s*')
+NOTES = re.compile(r'\(.*?\)')
+NON_WORD = re.compile(r'[^\w\s-]')
+
+
+def _parse_quantity(text):
+    if text in FRACTIONS:
+        return FRACTIONS[text]
+    if '/' in text:
+        numerator, denominator = (float(part) for part in text.split('/'))
+        return numerator / denominator if denominator else None
+    return float(text.replace(',', '.'))
+
+
+def normalize_ingredient(name):
+    """
+    Normalizes an ingredient name, e.g. ' Frische Tomaten (gewürfelt)' -> 'frische tomaten'.
+
+    Params:
+        name (str): The ingredient name.
+
+    Returns:
+        str: The lower case name without notes, punctuation and redundant whitespace.
+    """
+    name = NOTES.sub(' ', name.lower())
+    name = NON_WORD.sub(' ', name)
+    return ' '.join(name.split())
+
+
+def parse_ingredients(text):
+    """
+    Parses the free text of the 'Zutaten' column into structured ingredients.
+
+    Example: '100g Thunfisch, 2 Blätter Salat, 1/4 Gurke' is parsed into
+    Ingredient(100.0, 'g', 'thunfisch'), Ingredient(2.0, 'Blatt', 'salat') and Ingredient(0.25, None, 'gurke').
+    Ranges like '2-3 Tomaten' are parsed with their mean, Ingredient(2.5, None, 'tomaten').
+
+    Params:
+        text (str): The ingredients of a recipe, separated by commas, semicolons or new lines.
+
+    Returns:
+        list: A list of Ingredient(quantity, unit, name) tuples, quantity and unit are None if not given.
+    """
+    ingredients = []
+    for part in SEPARATOR.split(text or ''):
+        quantity, unit = None, None
+
+        match = QUANTITY.match(part)
+        if match:
+            values = [_parse_quantity(value.replace(' ', '')) for value in match.groups() if value]
+            quantity = None if None in values else sum(values) / len(values)
+            part = part[match.end():]
+
+        tokens = part.split(maxsplit=1)
+        if len(tokens) == 2 and tokens[0].lower().rstrip('.') in UNITS:
+            unit = UNITS[tokens[0].lower().rstrip('.')]
+            part = tokens[1]
+
+        name = normalize_ingredient(part)
+        if name:
+            ingredients.append(Ingredient(quantity, unit, name))
+    return ingredients
+
+
+class IngredientIndex:
+    """
+    An ingredient -> recipe index over a recipe snapshot, stored as one bitset per recipe.
+
+    Bit i of a recipe's bitset is set if the recipe uses the ingredient i of the vocabulary. Queries like
+    "which recipes can I cook with these ingredients" are answered with bitwise operations and popcounts
+    over the whole collection at once instead of a Python loop over the rows.
+    """
+
+    def __init__(self, ingredients_column):
+        """
+        Params:
+            ingredients_column (iterable): The 'Zutaten' texts of all recipes, in row order.
+        """
+        self.records = [parse_ingredients(text) for text in ingredients_column]
+        self.vocabulary = sorted({ingredient.name for record in self.records for ingredient in record})
+        self._positions = {name: position for position, name in enumerate(self.vocabulary)}
+
+        matrix = np.zeros((len(self.records), len(self.vocabulary)), dtype=bool)
+        for row, record in enumerate(self.records):
+            matrix[row, [self._positions[ingredient.name] for ingredient in record]] = True
+
+        self.bits = np.packbits(matrix, axis=1, bitorder='little')
+        self.counts = np.bitwise_count(self.bits).sum(axis=1, dtype=np.int32)
+
+    def bitset(self, ingredients):
+        """
+        Returns the bitset of a set of ingredients, unknown ingredients are ignored.
+
+        Params:
+            ingredients (iterable): The ingredient names.
+
+        Returns:
+            numpy.ndarray: The packed bitset.
+        """
+        selected = np.zeros(len(self.vocabulary), dtype=bool)
+        selected[[self._positions[name] for name in map(normalize_ingredient, ingredients) if name in self._positions]] = True
+        return np.packbits(selected, bitorder='little')
+
+    def cookable(self, available, max_missing=0):
+        """
+        Finds the recipes that can be cooked with the available ingredients.
+
+        Params:
+            available (iterable): The names of the available ingredients.
+            max_missing (int): The number of ingredients a recipe may lack.
+
+        Returns:
+            tuple: A tuple containing:
+                - numpy.ndarray: The row positions of the matching recipes, recipes lacking the fewest ingredients first.
+                - numpy.ndarray: The number of missing ingredients per returned recipe.
+        """
+        have = self.bitset(available)
+        missing = np.bitwise_count(self.bits & ~have).sum(axis=1, dtype=np.int32)
+        # At least one ingredient has to match, otherwise every small recipe would qualify
+        rows = np.flatnonzero((missing <= max_missing) & (missing < self.counts))
+        rows = rows[np.argsort(missing[rows], kind='stable')]
+        return rows, missing[rows]
+
+
+def get_ingredient_index(df):
+    """
+    Returns the ingredient index of a recipe snapshot, built once per snapshot version.
+
+    Params:
+        df (pandas.DataFrame): The DataFrame containing the recipe data.
+
+    Returns:
+        IngredientIndex: The ingredient index of the snapshot.
+    """
+    return cached_per_snapshot(df, 'ingredient_index', lambda _: IngredientIndex(df.get('Zutaten', ())))
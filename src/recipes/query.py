@@ -0,0 +1,143 @@
+import duckdb
+import numpy as np
+import pyarrow as pa
+
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+from database import snapshot_table, cached_per_snapshot
+
+
+FACETS = ['Kategorie', 'Ernährungsweise', 'Dauer']
+
+RecipeFilter = namedtuple('RecipeFilter', ['facets', 'contains', 'excluded'])
+
+
+def make_filter(facets=None, contains='', excluded=''):
+    """
+    Builds a normalized RecipeFilter from the UI selections.
+
+    Params:
+        facets (dict): The selected values per facet column, empty selections are ignored.
+        contains (str): Search terms separated by spaces.
+        excluded (str): Excluded ingredients separated by commas.
+
+    Returns:
+        RecipeFilter: The normalized filter, usable as a cache key:
+            - facets (tuple): Pairs of (column, accepted values), e.g. (('Kategorie', ('Frühstück',)),).
+            - contains (tuple): Terms that must all appear in the name or the ingredients.
+            - excluded (tuple): Terms that must not appear in the ingredients, e.g. ('nüsse',) for "ohne Nüsse".
+    """
+    facets = tuple(sorted((column, tuple(sorted(values))) for column, values in (facets or {}).items() if values))
+    contains = tuple(sorted({term.lower() for term in contains.split()}))
+    excluded = tuple(sorted({term.strip().lower() for term in excluded.split(',') if term.strip()}))
+    return RecipeFilter(facets, contains, excluded)
+
+
+@lru_cache(maxsize=256)
+def compile_filter(shape):
+    """
+    Compiles the shape of a filter into one parameterized SQL statement.
+
+    Filters with the same shape (same facet columns and number of values and terms) share the statement,
+    so repeated filter combinations reuse the cached SQL and only bind new parameters.
+
+    Params:
+        shape (tuple): The shape of the filter, see `_shape`.
+
+    Returns:
+        str: The SQL statement returning the matching row ids.
+    """
+    facet_shape, contains_count, excluded_count = shape
+    conditions = []
+    for column, value_count in facet_shape:
+        placeholders = ', '.join(['?'] * value_count)
+        conditions.append(f'"{column}" IN ({placeholders})')
+    conditions += ['(contains(lower("Gericht"), ?) OR contains(lower("Zutaten"), ?))'] * contains_count
+    conditions += ['NOT contains(lower("Zutaten"), ?)'] * excluded_count
+
+    where = ' AND '.join(conditions) or 'TRUE'
+    return f'SELECT row_id FROM recipes WHERE {where} ORDER BY row_id'
+
+
+def _shape(recipe_filter):
+    facet_shape = tuple((column, len(values)) for column, values in recipe_filter.facets)
+    return facet_shape, len(recipe_filter.contains), len(recipe_filter.excluded)
+
+
+def _parameters(recipe_filter):
+    parameters = [value for _, values in recipe_filter.facets for value in values]
+    for term in recipe_filter.contains:
+        parameters += [term, term]
+    parameters += list(recipe_filter.excluded)
+    return parameters
+
+
+def _query_table(df):
+    table = snapshot_table(df)
+    if table is None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    # Appending a column keeps the buffers of the existing ones
+    return table.append_column('row_id', pa.array(np.arange(len(df), dtype=np.int64)))
+
+
+class RecipeQueryEngine:
+    """
+    Runs combined recipe filters as one columnar DuckDB query over the current snapshot.
+
+    The memory-mapped Arrow table of the snapshot is registered as a view, which DuckDB scans without copying it.
+    Only DataFrames that do not come from a shared snapshot are converted to Arrow first.
+    """
+
+    def __init__(self):
+        self._connection = duckdb.connect()
+        self._lock = threading.Lock()
+        self._table = None
+
+    def _register(self, df):
+        # Registers the snapshot as the 'recipes' view, once per snapshot version
+        table = cached_per_snapshot(df, 'query_table', lambda _: _query_table(df))
+        if table is not self._table:
+            self._connection.register('recipes', table)
+            self._table = table
+
+    def query(self, df, recipe_filter):
+        """
+        Returns the row positions of the recipes matching a filter.
+
+        Params:
+            df (pandas.DataFrame): The DataFrame containing the recipe data.
+            recipe_filter (RecipeFilter): The filter, see `make_filter`.
+
+        Returns:
+            numpy.ndarray: The row positions of the matching recipes.
+        """
+        sql = compile_filter(_shape(recipe_filter))
+        with self._lock:
+            self._register(df)
+            result = self._connection.execute(sql, _parameters(recipe_filter)).fetchnumpy()
+        return result['row_id'].astype(np.int64)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def query_recipes(df, recipe_filter):
+    """
+    Returns the row positions of the recipes matching a filter, using the process-wide query engine.
+
+    Params:
+        df (pandas.DataFrame): The DataFrame containing the recipe data.
+        recipe_filter (RecipeFilter): The filter, see `make_filter`.
+
+    Returns:
+        numpy.ndarray: The row positions of the matching recipes.
+    """
+    global _engine
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = RecipeQueryEngine()
+    return _engine.query(df, recipe_filter)
@@ -1,25 +1,67 @@
 import gspread
 import streamlit as st
 
-from database import load_sheet_data
+from database import load_sheet_data, load_sharded_sheet_data, open_worksheet, open_sharded_worksheet, load_shared_sheet_data, invalidate_snapshot
+from utils import load_yaml_config
 
 
-def load_recipe():
+RECIPE_COLUMNS = ['Gericht', 'Kategorie', 'Ernährungsweise', 'Dauer', 'Zutaten', 'Zubereitung']
+CATEGORIES = ['Frühstück', 'Mittagessen', 'Abendessen', 'Beliebige Mahlzeit']
+NUTRITIONS = ['vegan', 'vegetarisch', 'andere']
+DURATIONS = ['kurz', 'mittel', 'lang']
+
+
+def validate_recipe(recipe):
+    """
+    Validates a recipe with the same rules as the recipe form.
+
+    Params:
+        recipe (dict): The recipe, with the keys of RECIPE_COLUMNS.
+
+    Returns:
+        list: The error messages, empty if the recipe is valid.
+    """
+    errors = [f'{column} fehlt' for column in RECIPE_COLUMNS if not str(recipe.get(column) or '').strip()]
+    if recipe.get('Kategorie') and recipe['Kategorie'] not in CATEGORIES:
+        errors.append(f"Unbekannte Kategorie: {recipe['Kategorie']}")
+    if recipe.get('Ernährungsweise') and recipe['Ernährungsweise'] not in NUTRITIONS:
+        errors.append(f"Unbekannte Ernährungsweise: {recipe['Ernährungsweise']}")
+    if recipe.get('Dauer') and recipe['Dauer'] not in DURATIONS:
+        errors.append(f"Unbekannte Dauer: {recipe['Dauer']}")
+    return errors
+
+
+def load_recipe(fresh=False):
     """
     Loads the recipe data from a Google Sheet.
 
     This function connects to a Google Sheet using the provided Sheet ID and credentials,
     loads the data into a Pandas DataFrame, and returns both the DataFrame and the worksheet object.
+    If a `recipe_shards` manifest is configured in config.yaml, all shards are loaded in parallel
+    and merged into one DataFrame instead. The data is served from the snapshot shared by all
+    server processes, so the sheet is only fetched when the snapshot is refreshed.
+
+    Params:
+        fresh (bool): Fetches the sheet even if the snapshot is not stale yet, e.g. before a bulk import.
 
     Returns:
         tuple: A tuple containing:
             - df (pandas.DataFrame): The DataFrame containing the loaded recipe data.
-            - worksheet (gspread.models.Worksheet): The worksheet object representing the Google Sheet.
+            - worksheet (gspread.models.Worksheet | database.ShardedWorksheet): The worksheet object representing the Google Sheet.
     """
     SHEET_ID = '150FEJZreTXRc3NrDRhSouMDFdAVfuQFxJ5NnRzPrm98'
     secrets = st.secrets['google']['application_credentials']
+    config = load_yaml_config()
+    manifest = config.get('recipe_shards')
+    
+    if manifest:
+        load_data = lambda: load_sharded_sheet_data(manifest, secrets)
+        open_sheet = lambda: open_sharded_worksheet(manifest, secrets)
+    else:
+        load_data = lambda: load_sheet_data(SHEET_ID, secrets)
+        open_sheet = lambda: open_worksheet(SHEET_ID, secrets)
     
-    df, worksheet = load_sheet_data(SHEET_ID, secrets)
+    df, worksheet = load_shared_sheet_data('recipes', load_data, open_sheet, config.get('snapshot_cache'), fresh)
     return df, worksheet
 
 
@@ -29,6 +71,7 @@ def add_recipe(worksheet, meal_name, ingredients, category, nutrition, duration,
 
     This function takes the details of a recipe, formats them into a dictionary, 
     and appends the recipe as a new row to the provided Google Sheets worksheet.
+    A sharded worksheet appends the row to the shard owning the recipe.
     It also provides error handling for API and network-related issues, 
     and gives feedback to the user via Streamlit.
 
@@ -56,6 +99,7 @@ def add_recipe(worksheet, meal_name, ingredients, category, nutrition, duration,
                 }
         
         worksheet.append_row(list(new_recipe.values()))
+        invalidate_snapshot('recipes')
         st.success(f'Rezept {meal_name} wurde erfolgreich hinzugefügt!')
         return True
     
@@ -0,0 +1,223 @@
+import numpy as np
+import scipy.sparse as sp
+
+import copy
+import re
+
+from database import cached_per_snapshot
+
+from .ingredients import get_ingredient_index
+
+
+TITLE_WORD = re.compile(r'\w{3,}')
+
+# Above this share of changed recipes a full rebuild is cheaper than patching the neighbor lists
+MAX_INCREMENTAL_CHANGE = 0.1
+# Above this share of added terms missing in the vocabulary the added recipes are no longer weighted sensibly
+MAX_UNKNOWN_TERMS = 0.1
+
+
+def _terms(title, ingredients):
+    terms = [f'z:{ingredient.name}' for ingredient in ingredients]
+    terms += [f't:{word}' for word in TITLE_WORD.findall(title.lower())]
+    return terms
+
+
+class SimilarityEngine:
+    """
+    Finds similar recipes based on a TF-IDF model over the ingredients and titles.
+
+    The sparse TF-IDF matrix is built once per snapshot and the top-k neighbors of every recipe are precomputed
+    in batched sparse matrix products, so a lookup at request time only returns the stored neighbors.
+    When recipes are added or deleted, the vocabulary and IDF weights are kept and only the affected
+    neighbor lists are recomputed. The changes and unknown terms are counted since the last full build,
+    so the model is rebuilt once they add up instead of drifting away from the collection.
+    """
+
+    def __init__(self, titles, ingredient_records, k=5, batch_size=512):
+        """
+        Params:
+            titles (list): The names ('Gericht') of all recipes, in row order.
+            ingredient_records (list): The parsed ingredients of all recipes, in row order.
+            k (int): The number of neighbors stored per recipe.
+            batch_size (int): The number of recipes compared with the whole collection per matrix product.
+        """
+        self.k = k
+        self.batch_size = batch_size
+        self.titles = list(titles)
+        self._rows = {title: row for row, title in enumerate(self.titles)}
+
+        documents = [_terms(title, record) for title, record in zip(self.titles, ingredient_records)]
+        self.vocabulary = {term: column for column, term in enumerate(sorted({term for terms in documents for term in terms}))}
+
+        counts = self._count_matrix(documents)
+        document_frequency = np.bincount(counts.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+
+        self.matrix = self._weight(counts)
+        self.neighbors, self.scores = self._top_k(np.arange(len(self.titles)))
+
+        # Since the last full build
+        self.changed = 0
+        self.added_terms = 0
+        self.unknown_terms = 0
+
+    def _count_matrix(self, documents):
+        indptr, indices = [0], []
+        for terms in documents:
+            indices.extend(self.vocabulary[term] for term in terms if term in self.vocabulary)
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        counts = sp.csr_matrix((data, indices, indptr), shape=(len(documents), len(self.vocabulary)))
+        counts.sum_duplicates()
+        return counts
+
+    def _weight(self, counts):
+        tfidf = counts.copy()
+        tfidf.data = (1 + np.log(tfidf.data)) * self.idf[tfidf.indices]
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sp.csr_matrix(sp.diags(1 / norms) @ tfidf, dtype=np.float32)
+
+    def _top_k(self, rows):
+        k = min(self.k, max(len(self.titles) - 1, 0))
+        neighbors = np.full((len(rows), self.k), -1, dtype=np.int32)
+        scores = np.zeros((len(rows), self.k), dtype=np.float32)
+        if k == 0:
+            return neighbors, scores
+
+        transposed = self.matrix.T.tocsc()
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            similarity = (self.matrix[batch] @ transposed).toarray()
+            similarity[np.arange(len(batch)), batch] = -1
+
+            top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(similarity, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            top[top_scores <= 0] = -1
+            neighbors[start:start + len(batch), :k] = top
+            scores[start:start + len(batch), :k] = np.maximum(top_scores, 0)
+        return neighbors, scores
+
+    def similar(self, title):
+        """
+        Returns the precomputed neighbors of a recipe.
+
+        Params:
+            title (str): The name ('Gericht') of the recipe.
+
+        Returns:
+            list: The names of the most similar recipes, most similar first.
+        """
+        row = self._rows.get(title)
+        if row is None:
+            return []
+        return [self.titles[neighbor] for neighbor in self.neighbors[row] if neighbor >= 0]
+
+    def update(self, titles, ingredient_records):
+        """
+        Updates the engine to a new snapshot by patching only the neighbor lists affected by the changes.
+
+        Added recipes are weighted with the existing vocabulary and IDF, their neighbors are computed and
+        they are merged into the neighbor lists of the other recipes. Recipes that had a deleted recipe
+        as neighbor are recomputed.
+
+        Params:
+            titles (list): The names ('Gericht') of all recipes of the new snapshot, in row order.
+            ingredient_records (list): The parsed ingredients of all recipes of the new snapshot, in row order.
+
+        Returns:
+            bool: True if the engine was updated, False if the changes since the last full build are too large
+                or bring too many new terms and a rebuild is needed.
+        """
+        titles = list(titles)
+        rows = {title: row for row, title in enumerate(titles)}
+        if len(rows) != len(titles) or len(self._rows) != len(self.titles):
+            return False
+
+        kept = [title for title in titles if title in self._rows]
+        added = [row for row, title in enumerate(titles) if title not in self._rows]
+        removed = len(self.titles) - len(kept)
+        changed = self.changed + len(added) + removed
+        if not titles or changed > MAX_INCREMENTAL_CHANGE * len(titles):
+            return False
+
+        new_documents = [_terms(titles[row], ingredient_records[row]) for row in added]
+        added_terms = self.added_terms + sum(len(terms) for terms in new_documents)
+        unknown_terms = self.unknown_terms + sum(term not in self.vocabulary for terms in new_documents for term in terms)
+        if unknown_terms > MAX_UNKNOWN_TERMS * added_terms:
+            return False
+        self.changed, self.added_terms, self.unknown_terms = changed, added_terms, unknown_terms
+
+        # Rows of the new snapshot, taken from the old matrix or weighted with the existing model
+        old_rows = np.array([self._rows.get(title, -1) for title in titles], dtype=np.int64)
+        added_matrix = self._weight(self._count_matrix(new_documents))
+        selection = old_rows.copy()
+        selection[old_rows < 0] = len(self.titles) + np.arange(len(added))
+        matrix = sp.csr_matrix(sp.vstack([self.matrix, added_matrix], format='csr')[selection], dtype=np.float32)
+
+        # Map the stored neighbor lists onto the new row numbers, deleted neighbors become -1
+        mapping = np.full(len(self.titles) + 1, -1, dtype=np.int32)
+        kept_old = old_rows[old_rows >= 0]
+        mapping[kept_old] = np.flatnonzero(old_rows >= 0)
+        neighbors = np.full((len(titles), self.k), -1, dtype=np.int32)
+        scores = np.zeros((len(titles), self.k), dtype=np.float32)
+        neighbors[old_rows >= 0] = mapping[self.neighbors[kept_old]]
+        scores[old_rows >= 0] = self.scores[kept_old]
+
+        self.titles, self._rows, self.matrix = titles, rows, matrix
+        self.neighbors, self.scores = neighbors, scores
+
+        stale = np.flatnonzero(((self.neighbors < 0) & (self.scores > 0)).any(axis=1))
+        recompute = np.union1d(stale, added).astype(np.int64)
+        if recompute.size:
+            self.neighbors[recompute], self.scores[recompute] = self._top_k(recompute)
+
+        if added:
+            self._merge_added(np.array(added, dtype=np.int64), recompute)
+        return True
+
+    def _merge_added(self, added, recomputed):
+        similarity = (self.matrix @ self.matrix[added].T).toarray()
+        similarity[added, np.arange(len(added))] = -1
+        similarity[recomputed] = -1
+
+        candidates = np.concatenate([self.neighbors, np.broadcast_to(added, (len(self.titles), len(added)))], axis=1)
+        candidate_scores = np.concatenate([self.scores, similarity.astype(np.float32)], axis=1)
+        candidate_scores[candidates < 0] = -1
+
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')[:, :self.k]
+        top = np.take_along_axis(candidates, order, axis=1)
+        top_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        top[top_scores <= 0] = -1
+        self.neighbors, self.scores = top.astype(np.int32), np.maximum(top_scores, 0)
+
+
+def get_similarity_engine(df):
+    """
+    Returns the similarity engine of a recipe snapshot.
+
+    The engine is built once and updated incrementally when a new snapshot version differs
+    only by a few added or deleted recipes.
+
+    Params:
+        df (pandas.DataFrame): The DataFrame containing the recipe data.
+
+    Returns:
+        SimilarityEngine: The similarity engine of the snapshot.
+    """
+    titles = df.get('Gericht', ())
+    records = get_ingredient_index(df).records
+
+    def build(previous):
+        # Update a copy, sessions may still be reading the engine of the previous version
+        engine = copy.copy(previous)
+        if engine is None or not engine.update(titles, records):
+            engine = SimilarityEngine(titles, records)
+        return engine
+
+    return cached_per_snapshot(df, 'similarity_engine', build)
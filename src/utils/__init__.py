@@ -1,3 +1,4 @@
 from .config import load_yaml_config, init_btn_session_state, toggle_btn_session_state
 from .search import search
-from .delete_row import delete_row
\ No newline at end of file
+from .delete_row import delete_row
+from .result_cache import result_cache, normalize_query
\ No newline at end of file
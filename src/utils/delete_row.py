@@ -1,12 +1,14 @@
 import streamlit as st
 import gspread
 
+from database import ShardedWorksheet, invalidate_snapshot
+
 def delete_row(worksheet, del_val, entity_type):
     """
     Deletes a row from the Google Sheet based on the del_val.
 
     Params:
-        worksheet (gspread.models.Worksheet): The worksheet object representing the Google Sheet.
+        worksheet (gspread.models.Worksheet | database.ShardedWorksheet): The worksheet object representing the Google Sheet.
         del_val (str): The name of the recipe to delete.
         entity_type(str): Either 'recipe' | 'user' for the custom promt of the status. 
 
@@ -14,10 +16,14 @@ def delete_row(worksheet, del_val, entity_type):
         bool: True if the row was successfully deleted, False if the row was not found or an error occurred.
     """
     try:
-        cell = worksheet.find(del_val)
+        if isinstance(worksheet, ShardedWorksheet):
+            worksheet, cell = worksheet.locate(del_val)
+        else:
+            cell = worksheet.find(del_val)
         
         if cell: 
             worksheet.delete_rows(cell.row)
+            invalidate_snapshot('recipes' if entity_type == 'recipe' else 'users')
             if entity_type == 'recipe':
                 st.success(f'Das Rezept: {del_val} wurde erfolgreich gelöscht!')
             elif entity_type == 'user':
@@ -0,0 +1,120 @@
+import numpy as np
+
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Rough size of the key, the OrderedDict entry and the array header besides the row ids
+ENTRY_OVERHEAD = 256
+
+
+class ResultCache:
+    """
+    A process-wide LRU cache for search and filter results.
+
+    Results are stored as compact arrays of row positions instead of DataFrame copies and are keyed by
+    (snapshot, snapshot version, kind, normalized query). Entries of older versions of a snapshot are
+    dropped as soon as a new version is seen, and the least recently used entries are evicted when the
+    memory budget is exceeded.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Params:
+            max_bytes (int): The memory budget of the cached row ids.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_rows(self, df, kind, query, compute):
+        """
+        Returns the cached row positions of a query, computing and storing them on a miss.
+
+        Params:
+            df (pandas.DataFrame): The snapshot the query runs on.
+            kind (str): The kind of query, e.g. 'search' or 'filter'.
+            query (hashable): The normalized query and filter set.
+            compute (callable): Returns the row positions of the query.
+
+        Returns:
+            numpy.ndarray: The row positions of the matching rows.
+        """
+        snapshot, version = df.attrs.get('snapshot'), df.attrs.get('snapshot_version')
+        if version is None:
+            return np.asarray(compute(), dtype=np.int32)
+
+        key = (snapshot, version, kind, query)
+        with self._lock:
+            if self._versions.get(snapshot) != version:
+                self._drop_snapshot(snapshot)
+                self._versions[snapshot] = version
+            rows = self._entries.get(key)
+            if rows is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return rows
+            self.misses += 1
+
+        rows = np.asarray(compute(), dtype=np.int32)
+        rows.setflags(write=False)
+
+        with self._lock:
+            if self._versions.get(snapshot) == version and key not in self._entries:
+                self._entries[key] = rows
+                self._size += rows.nbytes + ENTRY_OVERHEAD
+                self._evict()
+        return rows
+
+    def _drop_snapshot(self, snapshot):
+        for key in [key for key in self._entries if key[0] == snapshot]:
+            self._size -= self._entries.pop(key).nbytes + ENTRY_OVERHEAD
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            _, rows = self._entries.popitem(last=False)
+            self._size -= rows.nbytes + ENTRY_OVERHEAD
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Returns the usage statistics of the cache.
+
+        Returns:
+            dict: The number of entries, used bytes, hits, misses, evictions and the hit rate.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0
+            }
+
+
+result_cache = ResultCache()
+
+
+def normalize_query(query):
+    """
+    Normalizes a search query, so equivalent queries share a cache entry.
+
+    Lower casing is only valid because `search` matches the terms literally and case-insensitively,
+    as regular expressions '\\d' and '\\D' would not be equivalent.
+
+    Params:
+        query (str): Search terms separated by spaces.
+
+    Returns:
+        tuple: The sorted, lower case, unique search terms.
+    """
+    return tuple(sorted({term.lower() for term in query.split()}))
@@ -4,7 +4,7 @@ def search(df, search_params):
 
     Params:
         df (pandas.DataFrame): The DataFrame containing recipe data.
-        search_params (str): A string of search terms separated by spaces.
+        search_params (str): A string of search terms separated by spaces, each matched literally and case-insensitively.
 
     Returns:
         pandas.DataFrame: A DataFrame containing the cells that match the search terms.
@@ -12,5 +12,5 @@ def search(df, search_params):
     search_terms = search_params.split()
     
     for term in search_terms:
-        df = df[df.apply(lambda row: row.astype(str).str.contains(term, case=False, na=False).any(), axis=1)]
+        df = df[df.apply(lambda row: row.astype(str).str.contains(term, case=False, regex=False, na=False).any(), axis=1)]
     return df
\ No newline at end of file
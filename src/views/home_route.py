@@ -1,6 +1,6 @@
 import streamlit as st
 
-from recipes import load_recipe, handle_search, handle_optional_search
+from recipes import load_recipe, handle_search, handle_optional_search, handle_advanced_filter, handle_ingredient_search
   
 
 df, worksheet = load_recipe()
@@ -10,4 +10,6 @@ st.subheader('Rezeptvorschau')
 st.write(df.head())
 
 handle_search(df)
-handle_optional_search(df)
\ No newline at end of file
+handle_optional_search(df)
+handle_advanced_filter(df)
+handle_ingredient_search(df)
\ No newline at end of file